@@ -1,11 +1,22 @@
-print("pipeline_dag.py with conda env is being parsed!")
+print("pipeline_dag.py is being parsed!")
 from airflow import DAG
-from airflow.operators.bash_operator import BashOperator
+from airflow.decorators import task
 from datetime import datetime, timedelta
 import os
-import shlex
+import sys
 import logging
 
+# Define the base path relative to the DAG location and make the task modules
+# importable, so each task runs in-process instead of spawning a conda subprocess.
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../src"))
+sys.path.insert(0, BASE_PATH)
+logging.info("BASE_PATH: %s", BASE_PATH)
+
+# Scheduler-side tuning lives in the Airflow configuration rather than here, e.g.
+#   AIRFLOW__SCHEDULER__MIN_FILE_PROCESS_INTERVAL=30
+#   AIRFLOW__SCHEDULER__DAG_DIR_LIST_INTERVAL=60
+# (DAG serialization is always enabled on Airflow 2.x.)
+
 # Default arguments for the DAG
 default_args = {
     'owner': 'dmml_team',
@@ -26,76 +37,55 @@ dag = DAG(
     catchup=False
 )
 
-# Define the base path relative to the DAG location.
-BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../src"))
-logging.info("BASE_PATH: %s", BASE_PATH)
-
-# Using `conda run` to execute commands in the 'base' environment.
-# For each task, we change directory to the task folder and then run the corresponding script.
+# Each task imports its module only when it executes, keeping DAG parsing cheap.
+# Only the path of the cleaned Parquet file is handed from preparation to
+# transformation and model building through XCom; the data itself stays on disk
+# rather than in the Airflow metadata database.
 
 # Task 1: Data Ingestion
-ingestion_path = shlex.quote(os.path.join(BASE_PATH, "ingestion"))
-ingestion_task = BashOperator(
-    task_id='data_ingestion',
-    bash_command=f"cd {ingestion_path} && conda run -n base python data_ingestion.py",
-    dag=dag
-)
+@task(task_id='data_ingestion')
+def ingest():
+    from ingestion.data_ingestion import run
+    run()
 
-# Task 2: Raw Data Storage
-raw_storage_path = shlex.quote(os.path.join(BASE_PATH, "storage"))
-raw_data_storage_task = BashOperator(
-    task_id='raw_data_storage',
-    bash_command=f"cd {raw_storage_path} && conda run -n base python raw_data_storage.py",
-    dag=dag
-)
-
-# Task 3: Data Validation
-validation_path = shlex.quote(os.path.join(BASE_PATH, "validation"))
-validation_task = BashOperator(
-    task_id='data_validation',
-    bash_command=f"cd {validation_path} && conda run -n base python data_validation.py",
-    dag=dag
-)
+# Task 2: Data Validation
+@task(task_id='data_validation')
+def validate():
+    from validation.data_validation import run
+    run()
 
-# Task 4: Data Preparation
-preparation_path = shlex.quote(os.path.join(BASE_PATH, "preparation"))
-preparation_task = BashOperator(
-    task_id='data_preparation',
-    bash_command=f"cd {preparation_path} && conda run -n base python data_preparation.py",
-    dag=dag
-)
+# Task 3: Data Preparation
+@task(task_id='data_preparation')
+def prepare():
+    from preparation.data_preparation import CLEAN_DATA_PATH, run
+    return CLEAN_DATA_PATH if run() is not None else None
 
-# Task 5: Data Transformation and Storage
-transformation_path = shlex.quote(os.path.join(BASE_PATH, "transformation"))
-transformation_task = BashOperator(
-    task_id='data_transformation',
-    bash_command=f"cd {transformation_path} && conda run -n base python data_transformation.py",
-    dag=dag
-)
+# Task 4: Data Transformation and Storage
+@task(task_id='data_transformation')
+def transform(clean_data_path):
+    from transformation.data_transformation import run
+    run(clean_data_path=clean_data_path)
 
-# Task 6: Feature Store
-feature_store_path = shlex.quote(os.path.join(BASE_PATH, "feature_store"))
-feature_store_task = BashOperator(
-    task_id='feature_store',
-    bash_command=f"cd {feature_store_path} && conda run -n base python feature_store.py",
-    dag=dag
-)
+# Task 5: Feature Store
+@task(task_id='feature_store')
+def register_features():
+    from feature_store.feature_store import run
+    run()
 
-# Task 7: Data Versioning
-data_versioning_path = shlex.quote(os.path.join(BASE_PATH, "versioning"))
-data_versioning_task = BashOperator(
-    task_id='data_versioning',
-    bash_command=f"cd {data_versioning_path} && conda run -n base python data_versioning.py",
-    dag=dag
-)
+# Task 6: Data Versioning
+@task(task_id='data_versioning')
+def version_data():
+    from versioning.data_versioning import run
+    run()
 
-# Task 8: Model Building
-model_path = shlex.quote(os.path.join(BASE_PATH, "model"))
-model_building_task = BashOperator(
-    task_id='model_building',
-    bash_command=f"cd {model_path} && conda run -n base python model_building.py",
-    dag=dag
-)
+# Task 7: Model Building
+@task(task_id='model_building')
+def build_model(clean_data_path):
+    from model.model_building import run
+    run(clean_data_path=clean_data_path)
 
 # Define task dependencies in the order
-ingestion_task >> raw_data_storage_task >> validation_task >> preparation_task >> transformation_task >> feature_store_task >> data_versioning_task >> model_building_task
\ No newline at end of file
+with dag:
+    clean_data_path = prepare()
+    ingest() >> validate() >> clean_data_path
+    transform(clean_data_path) >> register_features() >> version_data() >> build_model(clean_data_path)
\ No newline at end of file
@@ -2,18 +2,118 @@
 
 import os
 import json
-import sqlite3
-import pandas as pd
+import queue
+import atexit
+import threading
+from contextlib import closing, contextmanager
+from functools import lru_cache
+from pathlib import Path
 
 # Compute the project root relative to this file
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 
-# Define the absolute path where the feature store (metadata) will be saved
-FEATURE_STORE_PATH = os.path.join(PROJECT_ROOT, "data", "processed", "feature_store.json")
+# Define the absolute path of the SQLite database holding the feature data (written by the
+# Data Transformation step) and the feature metadata registered here.
+FEATURE_DB_PATH = os.path.join(PROJECT_ROOT, "data", "processed", "employee_attrition_features.db")
+
+# Number of read-only connections kept open per database for retrieve_features.
+READ_POOL_SIZE = 4
+
+# Insert a feature's metadata, replacing the existing entry if it was registered before.
+UPSERT_FEATURE_SQL = (
+    "INSERT INTO features (feature_name, description, source, version) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(feature_name) DO UPDATE SET description=excluded.description, "
+    "source=excluded.source, version=excluded.version"
+)
+
+# PRAGMAs applied to every connection: a 128 MB page cache, 256 MB of memory-mapped I/O
+# and in-memory temporary tables.
+READ_PRAGMAS = ("cache_size=-131072", "mmap_size=268435456", "temp_store=MEMORY")
+
+# PRAGMAs applied to read-write connections only: WAL journaling lets readers run while
+# a writer commits, and synchronous=NORMAL skips the fsync on every commit under WAL.
+WRITE_PRAGMAS = ("journal_mode=WAL", "synchronous=NORMAL")
+
+# Read-only connection pools keyed by database path, created on first use.
+_read_pools = {}
+_read_pools_lock = threading.Lock()
+
+@lru_cache(maxsize=None)
+def _adbc_sqlite():
+    """
+    Return the ADBC SQLite DB-API module, or None if adbc-driver-sqlite is not installed.
+    """
+    try:
+        import adbc_driver_sqlite.dbapi as adbc_sqlite
+    except ImportError:
+        return None
+    return adbc_sqlite
+
+def _open_connection(db_path, read_only=True, use_adbc=True):
+    """
+    Open a SQLite connection to db_path with the performance PRAGMAs applied.
+
+    Read-only connections are opened with mode=ro, so SQLite never takes write locks
+    for them; they cannot change the journal mode, so the write PRAGMAs are skipped.
+    When adbc-driver-sqlite is installed, read-only connections use ADBC so query
+    results can be fetched as Arrow tables, unless use_adbc is False.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+        read_only (bool): Whether to open the database read-only.
+        use_adbc (bool): Whether a read-only connection may use ADBC.
+
+    Returns:
+        sqlite3.Connection or adbc_driver_manager.dbapi.Connection: The open connection.
+    """
+    import sqlite3
+
+    if read_only:
+        uri = Path(os.path.abspath(db_path)).as_uri() + "?mode=ro"
+        adbc_sqlite = _adbc_sqlite() if use_adbc else None
+        if adbc_sqlite is not None:
+            # Autocommit keeps a pooled connection from pinning an old read snapshot.
+            conn = adbc_sqlite.connect(uri, autocommit=True)
+            with conn.cursor() as cursor:
+                for pragma in READ_PRAGMAS:
+                    cursor.execute(f"PRAGMA {pragma}")
+            return conn
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        pragmas = READ_PRAGMAS
+    else:
+        conn = sqlite3.connect(db_path)
+        pragmas = WRITE_PRAGMAS + READ_PRAGMAS
+    for pragma in pragmas:
+        conn.execute(f"PRAGMA {pragma}")
+    return conn
+
+def connect_feature_store(db_path=None):
+    """
+    Open the feature store database and make sure the feature metadata table exists.
+
+    The database is switched to WAL journaling so readers are not blocked while
+    metadata is being written.
+
+    Args:
+        db_path (str): Path to the SQLite database file. If None, defaults to the processed database in the project.
+
+    Returns:
+        sqlite3.Connection: An open connection to the feature store database.
+    """
+    if db_path is None:
+        db_path = FEATURE_DB_PATH
+
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = _open_connection(db_path, read_only=False)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS features ("
+        "feature_name TEXT PRIMARY KEY, description TEXT, source TEXT, version TEXT)"
+    )
+    return conn
 
 def register_feature(feature_name, description, source, version):
     """
-    Register a feature by storing its metadata in a JSON file.
+    Register a feature by upserting its metadata into the feature store database.
 
     Args:
         feature_name (str): Name of the feature.
@@ -21,24 +121,41 @@ def register_feature(feature_name, description, source, version):
         source (str): The origin of the feature (e.g., which transformation or raw data it comes from).
         version (str): Version of the feature.
     """
-    # Load existing feature metadata if available
-    if os.path.exists(FEATURE_STORE_PATH):
-        with open(FEATURE_STORE_PATH, 'r') as f:
-            feature_store = json.load(f)
-    else:
-        feature_store = {}
+    with closing(connect_feature_store()) as conn, conn:
+        conn.execute(UPSERT_FEATURE_SQL, (feature_name, description, source, version))
+    print(f"Feature '{feature_name}' registered.")
 
-    # Update the feature store with the new feature
-    feature_store[feature_name] = {
-        "description": description,
-        "source": source,
-        "version": version
-    }
+def register_features_bulk(features):
+    """
+    Register several features using a single connection and transaction.
 
-    # Save the updated feature store back to disk.
-    with open(FEATURE_STORE_PATH, 'w') as f:
-        json.dump(feature_store, f, indent=4)
-    print(f"Feature '{feature_name}' registered.")
+    Args:
+        features (list of dict): Feature metadata, each dict holding the
+            register_feature arguments (feature_name, description, source, version).
+    """
+    rows = [
+        (f["feature_name"], f["description"], f["source"], f["version"])
+        for f in features
+    ]
+    with closing(connect_feature_store()) as conn, conn:
+        conn.executemany(UPSERT_FEATURE_SQL, rows)
+    for row in rows:
+        print(f"Feature '{row[0]}' registered.")
+
+def _has_features_table(conn):
+    """
+    Check whether the feature metadata table exists, without creating it.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the feature store database.
+
+    Returns:
+        bool: True if the features table exists.
+    """
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'features'"
+    ).fetchone()
+    return row is not None
 
 def get_feature_metadata(feature_name):
     """
@@ -50,13 +167,20 @@ def get_feature_metadata(feature_name):
     Returns:
         dict or None: A dictionary of the feature metadata if found, else None.
     """
-    if os.path.exists(FEATURE_STORE_PATH):
-        with open(FEATURE_STORE_PATH, 'r') as f:
-            feature_store = json.load(f)
-        return feature_store.get(feature_name)
-    else:
-        print("Feature store file not found. No features have been registered yet.")
+    if not os.path.exists(FEATURE_DB_PATH):
+        print("Feature store database not found. No features have been registered yet.")
+        return None
+    # A read-only lookup: no write PRAGMAs and no table creation.
+    with closing(_open_connection(FEATURE_DB_PATH, read_only=True, use_adbc=False)) as conn:
+        if not _has_features_table(conn):
+            return None
+        row = conn.execute(
+            "SELECT description, source, version FROM features WHERE feature_name = ?",
+            (feature_name,)
+        ).fetchone()
+    if row is None:
         return None
+    return {"description": row[0], "source": row[1], "version": row[2]}
 
 def list_features():
     """
@@ -65,13 +189,79 @@ def list_features():
     Returns:
         dict: A dictionary containing all registered feature metadata.
     """
-    if os.path.exists(FEATURE_STORE_PATH):
-        with open(FEATURE_STORE_PATH, 'r') as f:
-            feature_store = json.load(f)
-        return feature_store
-    else:
-        print("Feature store file not found. No features have been registered yet.")
+    if not os.path.exists(FEATURE_DB_PATH):
+        print("Feature store database not found. No features have been registered yet.")
         return {}
+    # A read-only lookup: no write PRAGMAs and no table creation.
+    with closing(_open_connection(FEATURE_DB_PATH, read_only=True, use_adbc=False)) as conn:
+        if not _has_features_table(conn):
+            return {}
+        rows = conn.execute("SELECT feature_name, description, source, version FROM features").fetchall()
+    return {
+        name: {"description": description, "source": source, "version": version}
+        for name, description, source, version in rows
+    }
+
+def _get_read_pool(db_path):
+    """
+    Return the pool of read-only connections for db_path, filling it on first use.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+
+    Returns:
+        queue.Queue: Pool of open read-only connections.
+    """
+    with _read_pools_lock:
+        pool = _read_pools.get(db_path)
+        if pool is None:
+            pool = queue.Queue(maxsize=READ_POOL_SIZE)
+            for _ in range(READ_POOL_SIZE):
+                pool.put(_open_connection(db_path, read_only=True))
+            _read_pools[db_path] = pool
+    return pool
+
+@contextmanager
+def pool_checkout(db_path):
+    """
+    Check a read-only connection out of the pool for db_path and return it afterwards.
+
+    The connections stay open until close_read_pools, so repeated queries skip the
+    connect and PRAGMA setup.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+
+    Yields:
+        sqlite3.Connection or adbc_driver_manager.dbapi.Connection: A pooled read-only connection.
+    """
+    pool = _get_read_pool(db_path)
+    conn = pool.get()
+    try:
+        yield conn
+    finally:
+        pool.put(conn)
+
+def close_read_pools():
+    """
+    Close every pooled read-only connection and checkpoint each database's WAL.
+
+    Read-only connections cannot remove the -wal and -shm files, so each database is
+    reopened read-write once after its pool is closed; as the last connection, its
+    close checkpoints the log and deletes them.
+    """
+    import sqlite3
+
+    with _read_pools_lock:
+        pools = list(_read_pools.items())
+        _read_pools.clear()
+    for db_path, pool in pools:
+        while not pool.empty():
+            pool.get_nowait().close()
+        with closing(sqlite3.connect(db_path)) as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+atexit.register(close_read_pools)
 
 def retrieve_features(query="SELECT * FROM employee_features LIMIT 5", 
                       db_path=None):
@@ -84,38 +274,52 @@ def retrieve_features(query="SELECT * FROM employee_features LIMIT 5",
     
     Returns:
         pd.DataFrame or None: DataFrame with query results if successful; otherwise, None.
+            With adbc-driver-sqlite installed, the columns are Arrow-backed.
     """
+    import pandas as pd
+
     if db_path is None:
-        db_path = os.path.join(PROJECT_ROOT, "data", "processed", "employee_attrition_features.db")
+        db_path = FEATURE_DB_PATH
         
     if not os.path.exists(db_path):
         print(f"Database not found at {db_path}.")
         return None
 
-    conn = sqlite3.connect(db_path)
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    with pool_checkout(db_path) as conn:
+        if _adbc_sqlite() is not None:
+            # Fetch the result as an Arrow table, skipping per-cell Python objects.
+            with conn.cursor() as cursor:
+                cursor.execute(query)
+                df = cursor.fetch_arrow_table().to_pandas(types_mapper=pd.ArrowDtype)
+        else:
+            df = pd.read_sql_query(query, conn)
     return df
 
-if __name__ == "__main__":
-    register_feature(
-        feature_name="age",
-        description="Normalized age of the employee.",
-        source="Transformed employee attrition data (data preparation & transformation steps).",
-        version="v1.0"
-    )
-    register_feature(
-        feature_name="length_of_service",
-        description="Normalized length of service (in years).",
-        source="Transformed employee attrition data (data preparation & transformation steps).",
-        version="v1.0"
-    )
-    register_feature(
-        feature_name="department_name",
-        description="Encoded department of the employee.",
-        source="Transformed employee attrition data (data preparation & transformation steps).",
-        version="v1.0"
-    )
+def run():
+    """
+    Register the pipeline features and print the registered metadata and a
+    sample of the stored feature data.
+    """
+    register_features_bulk([
+        {
+            "feature_name": "age",
+            "description": "Normalized age of the employee.",
+            "source": "Transformed employee attrition data (data preparation & transformation steps).",
+            "version": "v1.0"
+        },
+        {
+            "feature_name": "length_of_service",
+            "description": "Normalized length of service (in years).",
+            "source": "Transformed employee attrition data (data preparation & transformation steps).",
+            "version": "v1.0"
+        },
+        {
+            "feature_name": "department_name",
+            "description": "Encoded department of the employee.",
+            "source": "Transformed employee attrition data (data preparation & transformation steps).",
+            "version": "v1.0"
+        }
+    ])
     
     # List all registered features.
     features = list_features()
@@ -131,4 +335,11 @@ if __name__ == "__main__":
     sample_features = retrieve_features()
     if sample_features is not None:
         print("\n=== Sample Feature Data from Database ===")
-        print(sample_features.head())
\ No newline at end of file
+        print(sample_features.head())
+
+    # Release the pooled connections so the database is left without -wal/-shm files
+    # for the versioning step.
+    close_read_pools()
+
+if __name__ == "__main__":
+    run()
\ No newline at end of file
@@ -1,53 +1,126 @@
 # src/ingestion/data_ingestion.py
 
 import os
+import json
 import logging
-import subprocess
 import shutil
+import tempfile
 from datetime import datetime
-import shlex
 
-def download_kaggle_dataset(dataset_slug, dest_folder):
+def get_kaggle_api():
+    """
+    Create an authenticated Kaggle API client.
+
+    Returns:
+        KaggleApi: The authenticated client.
+    """
+    # Imported here because importing the kaggle package authenticates immediately.
+    from kaggle.api.kaggle_api_extended import KaggleApi
+
+    api = KaggleApi()
+    api.authenticate()
+    return api
+
+def get_dataset_last_updated(api, dataset_slug):
+    """
+    Look up when a Kaggle dataset was last updated.
+
+    Args:
+        api (KaggleApi): An authenticated Kaggle API client.
+        dataset_slug (str): The dataset identifier, in the format <owner>/<dataset-name>.
+
+    Returns:
+        str or None: The dataset's last-updated time, or None if the dataset was not found.
+    """
+    owner, name = dataset_slug.split("/", 1)
+    for dataset in api.dataset_list(user=owner, search=name) or []:
+        if dataset is not None and str(dataset.ref).lower() == dataset_slug.lower():
+            # kaggle>=2 exposes last_updated, older clients lastUpdated.
+            last_updated = getattr(dataset, "last_updated", None) or getattr(dataset, "lastUpdated", None)
+            return str(last_updated) if last_updated else None
+    return None
+
+def write_download_meta(meta_path, dataset_slug, last_updated):
+    """
+    Record the stored version of a dataset in its sidecar metadata file.
+
+    This should only be called once the downloaded files have been stored, so that a
+    failed store is retried on the next run instead of being skipped as unchanged.
+
+    Args:
+        meta_path (str): Path of the sidecar metadata file.
+        dataset_slug (str): The dataset identifier, in the format <owner>/<dataset-name>.
+        last_updated (str): The dataset's last-updated time reported by Kaggle.
+    """
+    with open(meta_path, 'w') as f:
+        json.dump({"dataset": dataset_slug, "lastUpdated": last_updated}, f, indent=4)
+
+def download_kaggle_dataset(dataset_slug, dest_folder, meta_path=None):
     """
     Download a dataset from Kaggle using the Kaggle API into dest_folder.
+
+    The download is skipped when Kaggle reports the same last-updated time as the
+    one recorded in the sidecar JSON file by write_download_meta. The sidecar is not
+    written here; the caller records it once the files are stored.
+
+    Args:
+        dataset_slug (str): The dataset identifier, in the format <owner>/<dataset-name>.
+        dest_folder (str): Folder to download and unzip the dataset into.
+        meta_path (str): Path of the sidecar metadata file. Defaults to dest_folder/.meta.json.
+
+    Returns:
+        tuple: (downloaded, last_updated). downloaded is True if the dataset was
+        downloaded, False if it was unchanged or the download failed; last_updated is
+        the dataset's last-updated time reported by Kaggle, or None if unknown.
     """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    last_updated = None
+    if meta_path is None:
+        meta_path = os.path.join(dest_folder, ".meta.json")
     try:
         os.makedirs(dest_folder, exist_ok=True)
         
+        api = get_kaggle_api()
+        
+        # Skip the download when the dataset has not changed since the last one.
+        last_updated = get_dataset_last_updated(api, dataset_slug)
+        if last_updated is not None and os.path.exists(meta_path):
+            with open(meta_path, 'r') as f:
+                local_meta = json.load(f)
+            if local_meta.get("lastUpdated") == last_updated:
+                logging.info(f"{timestamp}: Dataset {dataset_slug} unchanged since {last_updated}, skipping download")
+                return False, last_updated
+        
         # Log the start of the download.
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         logging.info(f"{timestamp}: Starting download for dataset: {dataset_slug}")
         
-        # Use shlex.quote to properly quote the dest_folder in case it contains spaces.
-        quoted_dest = shlex.quote(dest_folder)
-        # Build and run the download command.
-        command = f"kaggle datasets download -d {dataset_slug} -p {quoted_dest} --unzip"
-        subprocess.run(command, shell=True, check=True)
+        # Download and unzip in-process rather than through the kaggle CLI in a shell.
+        api.dataset_download_files(dataset_slug, path=dest_folder, unzip=True, quiet=False)
         
         # Log successful download.
         logging.info(f"{timestamp}: Successfully downloaded dataset {dataset_slug} to {dest_folder}")
-    except subprocess.CalledProcessError as e:
-        logging.error(f"{timestamp}: Failed to download dataset {dataset_slug}. Error: {e.stderr if e.stderr else str(e)}")
+        return True, last_updated
     except Exception as e:
-        logging.error(f"{timestamp}: An unexpected error occurred: {e}")
+        logging.error(f"{timestamp}: Failed to download dataset {dataset_slug}. Error: {e}")
+    return False, last_updated
 
-def store_data(raw_folder, stored_base_folder):
+def store_data(download_folder, stored_base_folder):
     """
-    Copy downloaded files from the raw folder into the stored folder structure.
+    Move downloaded files from the download folder into the stored folder structure.
     
     The stored structure will be:
        stored_base_folder/<source>/<year>/<month>/<day>/
     
-    Each file name will be appended with the current timestamp.
+    Each file name will be appended with the current timestamp. Hidden files (such as
+    .DS_Store) are not moved. The download folder should live inside stored_base_folder
+    so that each file is moved with a rename rather than copied.
     
-    After copying, this function deletes any file directly in the 
+    After moving, this function deletes any file directly in the 
     stored_base_folder (non-directory items) to ensure only timestamped versions remain.
     
     Importantly, if the day's target folder already exists, it is left intact so that 
     multiple DAG runs on the same day will accumulate new timestamped files.
     """
-    import re
-
     # Get current timestamp details.
     timestamp = datetime.now()
     year = timestamp.strftime("%Y")
@@ -60,32 +133,35 @@ def store_data(raw_folder, stored_base_folder):
     target_folder = os.path.join(stored_base_folder, "kaggle", year, month, day)
     os.makedirs(target_folder, exist_ok=True)  # DO NOT remove the folder if it exists.
     
-    # Copy each file from the raw folder into the target folder with a timestamp appended.
-    for file in os.listdir(raw_folder):
-        file_path = os.path.join(raw_folder, file)
-        if os.path.isfile(file_path):
-            name, ext = os.path.splitext(file)
+    # Move each downloaded file into the target folder with a timestamp appended.
+    # scandir entries carry the file type from the directory read, avoiding a stat per file.
+    with os.scandir(download_folder) as entries:
+        for entry in entries:
+            if not entry.is_file() or entry.name.startswith('.'):
+                continue
+            name, ext = os.path.splitext(entry.name)
             new_file_name = f"{name}_{time_str}{ext}"
             target_file = os.path.join(target_folder, new_file_name)
-            shutil.copy(file_path, target_file)
+            # On the same filesystem this is a metadata-only rename, no bytes are copied.
+            shutil.move(entry.path, target_file)
             logging.info(f"Stored file {target_file}")
     
     # Clean up: remove any files directly under stored_base_folder (non-directory items)
-    for item in os.listdir(stored_base_folder):
-        item_path = os.path.join(stored_base_folder, item)
-        if os.path.isfile(item_path):
-            os.remove(item_path)
-            logging.info(f"Deleted non-timestamp file {item_path}")
+    with os.scandir(stored_base_folder) as entries:
+        for entry in entries:
+            if entry.is_file():
+                os.remove(entry.path)
+                logging.info(f"Deleted non-timestamp file {entry.path}")
 
-if __name__ == "__main__":
+def run():
+    """
+    Download the Kaggle dataset and move it into the stored folder structure,
+    logging to logs/ingestion.log.
+    """
     # Compute the project root
     script_path = os.path.dirname(__file__)
     project_root = os.path.abspath(os.path.join(script_path, "../../"))
     
-    # Define the raw destination folder (without any timestamp subfolder)
-    raw_folder = os.path.join(project_root, "data", "raw", "kaggle")
-    os.makedirs(raw_folder, exist_ok=True)
-    
     # Configure logging.
     logs_path = os.path.join(project_root, "logs")
     os.makedirs(logs_path, exist_ok=True)
@@ -95,10 +171,31 @@ if __name__ == "__main__":
         format='%(asctime)s:%(levelname)s:%(message)s'
     )
     
-    # Download the dataset to the raw folder.
-    dataset_slug = "HRAnalyticRepository/employee-attrition-data"
-    download_kaggle_dataset(dataset_slug, raw_folder)
-    
-    # Now copy the downloaded file(s) into the stored folder structure.
+    # Download into a temporary folder on the same filesystem as the stored tree, so
+    # the files can be renamed into their dated partition instead of being staged and
+    # copied. It sits outside the kaggle/ tree that validation and preparation scan, so
+    # a partial download is never picked up as the latest file.
     stored_folder = os.path.join(project_root, "data", "stored", "raw")
-    store_data(raw_folder, stored_folder)
\ No newline at end of file
+    source_folder = os.path.join(stored_folder, "kaggle")
+    os.makedirs(source_folder, exist_ok=True)
+    download_folder = tempfile.mkdtemp(prefix=".download_", dir=stored_folder)
+    
+    try:
+        dataset_slug = "HRAnalyticRepository/employee-attrition-data"
+        meta_path = os.path.join(source_folder, ".meta.json")
+        downloaded, last_updated = download_kaggle_dataset(dataset_slug, download_folder, meta_path=meta_path)
+        
+        # Now move the downloaded file(s) into the stored folder structure. Nothing new
+        # is stored when the download was skipped or failed.
+        if not downloaded:
+            logging.info(f"No new data downloaded for {dataset_slug}; nothing to store")
+            return
+        store_data(download_folder, stored_folder)
+        
+        # Only now that the files are stored, record the version for the next run.
+        write_download_meta(meta_path, dataset_slug, last_updated)
+    finally:
+        shutil.rmtree(download_folder, ignore_errors=True)
+
+if __name__ == "__main__":
+    run()
\ No newline at end of file
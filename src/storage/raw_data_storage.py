@@ -2,10 +2,52 @@
 
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import re
 
-def partition_raw_data(source_folder, storage_root):
+# Maximum number of file copies in flight at once.
+QUEUE_DEPTH = 32
+
+# Detects filenames with a timestamp: an underscore, followed by 8 digits, an underscore,
+# and 6 digits, then a dot and file extension.
+TIMESTAMP_PATTERN = re.compile(r"_\d{8}_\d{6}\.")
+
+def _copy_file(source_path, destination_path):
+    """
+    Copy the contents of source_path to destination_path inside the kernel.
+    
+    Uses os.copy_file_range where available (Linux), which clones the data on
+    copy-on-write filesystems and otherwise copies it without passing through
+    userspace. Falls back to shutil.copyfile on other platforms or when the
+    filesystem does not support it. File permissions are not copied.
+    
+    Args:
+        source_path (str): The file to copy.
+        destination_path (str): The path of the copy.
+    """
+    if hasattr(os, "copy_file_range"):
+        src_fd = os.open(source_path, os.O_RDONLY)
+        try:
+            dst_fd = os.open(destination_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                remaining = os.fstat(src_fd).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                return
+            except OSError:
+                # e.g. EXDEV or ENOSYS on older kernels; use the portable path below.
+                pass
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+    shutil.copyfile(source_path, destination_path)
+
+def partition_raw_data(source_folder, storage_root, queue_depth=QUEUE_DEPTH):
     """
     Organizes files from source_folder into a partitioned folder structure in storage_root.
     
@@ -14,29 +56,37 @@ def partition_raw_data(source_folder, storage_root):
     Folder structure:
       storage_root/<source>/<year>/<month>/<day>/<filename>
     
+    The copies are independent and I/O bound, so they run on a thread pool.
+    
     Args:
         source_folder (str): The folder where raw files are initially downloaded.
         storage_root (str): The root folder where files will be organized.
+        queue_depth (int): The maximum number of files copied concurrently.
     """
+    # The ingestion step now downloads straight into the stored folder structure, so
+    # there may be no raw download folder to partition.
+    if not os.path.isdir(source_folder):
+        print(f"Source folder not found, nothing to partition: {source_folder}")
+        return
+    
     # Ensure the storage root exists.
     os.makedirs(storage_root, exist_ok=True)
     
-    # Define a regex pattern to detect filenames with a timestamp.
-    # This pattern expects an underscore, followed by 8 digits, an underscore, and 6 digits,
-    # then a dot and file extension.
-    timestamp_pattern = re.compile(r".*_\d{8}_\d{6}\..*$")
-    
-    # Iterate over each file in the source folder.
-    for filename in os.listdir(source_folder):
+    # Collect the (source, destination) pairs to copy from the source folder.
+    copy_pairs = []
+    with os.scandir(source_folder) as it:
+        entries = list(it)
+    for entry in entries:
+        filename = entry.name
         # Process only files that match the timestamp pattern.
-        if not timestamp_pattern.match(filename):
+        if not TIMESTAMP_PATTERN.search(filename):
             print(f"Skipping non-timestamp file: {filename}")
             continue
 
-        source_file_path = os.path.join(source_folder, filename)
-        if os.path.isfile(source_file_path):
+        source_file_path = entry.path
+        if entry.is_file():
             # Use the file's modification time as a proxy for its timestamp.
-            mod_time = os.path.getmtime(source_file_path)
+            mod_time = entry.stat().st_mtime
             file_datetime = datetime.fromtimestamp(mod_time)
             
             # Build the partition path based on the timestamp.
@@ -46,16 +96,29 @@ def partition_raw_data(source_folder, storage_root):
             
             # Here, we assume the source is 'kaggle' for this dataset.
             partition_path = os.path.join(storage_root, "kaggle", year, month, day)
-            os.makedirs(partition_path, exist_ok=True)
             
             # Define the destination path.
             destination_path = os.path.join(partition_path, filename)
-            
-            # Copy the file to the new partitioned location.
-            shutil.copy(source_file_path, destination_path)
-            print(f"Copied {filename} to {destination_path}")
+            copy_pairs.append((source_file_path, destination_path))
+    
+    if not copy_pairs:
+        return
+    
+    # Create each partition directory once, before any copy starts.
+    for partition_path in {os.path.dirname(dst) for _, dst in copy_pairs}:
+        os.makedirs(partition_path, exist_ok=True)
+    
+    # Copy the files to their partitioned locations concurrently.
+    max_workers = min(queue_depth, (os.cpu_count() or 1) * 4, len(copy_pairs))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(lambda pair: _copy_file(*pair), copy_pairs))
+    for source_file_path, destination_path in copy_pairs:
+        print(f"Copied {os.path.basename(source_file_path)} to {destination_path}")
 
-if __name__ == "__main__":
+def run():
+    """
+    Partition the raw Kaggle download folder into the stored folder structure.
+    """
     # Define the source folder: raw data downloaded (e.g., without timestamp folder)
     source_folder = os.path.join(os.path.dirname(__file__), "../../data/raw/kaggle")
     source_folder = os.path.abspath(source_folder)
@@ -64,4 +127,7 @@ if __name__ == "__main__":
     storage_root = os.path.join(os.path.dirname(__file__), "../../data/stored/raw")
     storage_root = os.path.abspath(storage_root)
     
-    partition_raw_data(source_folder, storage_root)
\ No newline at end of file
+    partition_raw_data(source_folder, storage_root)
+
+if __name__ == "__main__":
+    run()
\ No newline at end of file
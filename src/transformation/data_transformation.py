@@ -1,7 +1,9 @@
 # src/transformation/data_transformation.py
 
 import os
+import sys
 import pandas as pd
+import numpy as np
 import sqlite3
 
 def transform_data(df):
@@ -30,37 +32,38 @@ def transform_data(df):
     # Create an AgeGroup feature if the 'age' column exists.
     if 'age' in df.columns:
         # Define bins and labels for age groups.
-        bins = [17, 30, 45, 60, 100]
+        bins = np.array([17, 30, 45, 60, 100])
         labels = ['Young', 'Mid-age', 'Senior', 'Veteran']
-        df['AgeGroup'] = pd.cut(df['age'], bins=bins, labels=labels)
+        # Look up the right-closed bin of each age with one searchsorted call, as
+        # pd.cut does; ages outside (17, 100] and missing ages get no group.
+        codes = np.searchsorted(bins, df['age'].to_numpy(dtype=np.float64), side='left') - 1
+        codes[(codes < 0) | (codes >= len(labels))] = -1
+        df['AgeGroup'] = pd.Categorical.from_codes(codes, categories=labels, ordered=True)
     
     # --- Step 3: Standardize Numeric Columns ---
     # Identify numeric columns (e.g., age, length_of_service)
-    numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
-    for col in numeric_cols:
-        mean = df[col].mean()
-        std = df[col].std()
-        if std != 0:
-            df[col] = (df[col] - mean) / std
-        else:
-            df[col] = 0  # In case the column has constant values
+    numeric_cols = df.select_dtypes(include=['float32', 'float64', 'int16', 'int64']).columns.tolist()
+    if numeric_cols:
+        X = df[numeric_cols].to_numpy(dtype=np.float32)
+        mean = np.nanmean(X, axis=0, dtype=np.float64)
+        std = np.nanstd(X, axis=0, dtype=np.float64, ddof=1)
+        std[(std == 0) | np.isnan(std)] = 1  # Constant columns become 0
+        np.subtract(X, mean, out=X)
+        np.divide(X, std, out=X)
+        df[numeric_cols] = X
     
     # --- Step 4: Handle Categorical Variables ---
     # Identify categorical columns (e.g., city_name, department_name, job_title, store_name, gender_short, etc.)
     categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
     
     # Determine high- versus low-cardinality columns based on a threshold.
-    high_cardinality_cols = []
-    low_cardinality_cols = []
     cardinality_threshold = 50 
+    unique_counts = df[categorical_cols].nunique()
     print("\n=== Categorical Column Cardinality ===")
-    for col in categorical_cols:
-        unique_count = df[col].nunique()
+    for col, unique_count in unique_counts.items():
         print(f"Column '{col}' has {unique_count} unique values.")
-        if unique_count > cardinality_threshold:
-            high_cardinality_cols.append(col)
-        else:
-            low_cardinality_cols.append(col)
+    high_cardinality_cols = unique_counts.index[unique_counts > cardinality_threshold].tolist()
+    low_cardinality_cols = unique_counts.index[unique_counts <= cardinality_threshold].tolist()
     
     if high_cardinality_cols:
         print(f"\nDropping high-cardinality columns: {high_cardinality_cols}")
@@ -68,9 +71,10 @@ def transform_data(df):
     else:
         print("\nNo high-cardinality columns to drop.")
     
-    # Apply one-hot encoding only to the low-cardinality categorical columns.
+    # Apply one-hot encoding only to the low-cardinality categorical columns. The
+    # indicator columns are uint8 rather than the default int64.
     if low_cardinality_cols:
-        df_encoded = pd.get_dummies(df, columns=low_cardinality_cols, drop_first=True)
+        df_encoded = pd.get_dummies(df, columns=low_cardinality_cols, drop_first=True, dtype=np.uint8)
     else:
         df_encoded = df.copy()
     
@@ -80,7 +84,9 @@ def store_transformed_data(df, db_path):
     """
     Store the transformed DataFrame into a SQLite database.
     
-    The DataFrame is written into a table named "employee_features".
+    The DataFrame is written into a table named "employee_features". It is first
+    written to a staging table, which then replaces the old table in one transaction,
+    so a failed write leaves the previous table intact.
     
     Args:
         df (pd.DataFrame): The transformed DataFrame.
@@ -92,26 +98,59 @@ def store_transformed_data(df, db_path):
     # Connect to (or create) the SQLite database
     conn = sqlite3.connect(db_path)
     
-    # Write the DataFrame to a SQL table named "employee_features".
-    df.to_sql("employee_features", conn, if_exists="replace", index=False)
-    conn.close()
+    # The table is fully rebuilt from the clean data on every run, so skip the
+    # per-commit fsync and let the inserts stream into the write-ahead log.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    
+    # Write the DataFrame to a staging table first. to_sql commits its DDL and inserts
+    # itself, so it cannot take part in a surrounding transaction.
+    staging_table = "employee_features_staging"
+    try:
+        conn.execute(f'DROP TABLE IF EXISTS "{staging_table}"')
+        df.to_sql(staging_table, conn, if_exists="replace", index=False, chunksize=10_000)
+        
+        # Swap the staging table in as "employee_features" in a single transaction.
+        conn.execute("BEGIN")
+        conn.execute('DROP TABLE IF EXISTS "employee_features"')
+        conn.execute(f'ALTER TABLE "{staging_table}" RENAME TO "employee_features"')
+        conn.commit()
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.execute(f'DROP TABLE IF EXISTS "{staging_table}"')
+        raise
+    finally:
+        conn.close()
     print(f"Transformed data stored in SQLite database at: {db_path}")
 
-if __name__ == "__main__":
+def run(df_clean=None, clean_data_path=None):
+    """
+    Transform the clean data produced by the preparation step and store the
+    result in the SQLite feature database.
+
+    Args:
+        df_clean (pd.DataFrame): The clean data from the preparation step. If None,
+            it is read from clean_data_path.
+        clean_data_path (str): The cleaned Parquet file written by the preparation
+            step. Defaults to data/processed/clean_data.parquet.
+    """
     # Compute the project root relative to this file (assumes file is at src/transformation)
     project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
     
-    # Define the path to the cleaned CSV file produced in the data preparation step.
-    clean_data_path = os.path.join(project_root, "data", "processed", "clean_data.csv")
+    # Define the path to the cleaned Parquet file produced in the data preparation step.
+    if clean_data_path is None:
+        clean_data_path = os.path.join(project_root, "data", "processed", "clean_data.parquet")
     
-    if not os.path.exists(clean_data_path):
+    if df_clean is None and not os.path.exists(clean_data_path):
         print(f"Clean data file not found at: {clean_data_path}")
     else:
-        # Load the clean data.
-        df_clean = pd.read_csv(clean_data_path)
-        print("=== Loaded Clean Data ===")
-        print(df_clean.info())
-        print(df_clean.head())
+        if df_clean is None:
+            # Load the clean data.
+            df_clean = pd.read_parquet(clean_data_path)
+            print("=== Loaded Clean Data ===")
+            print(df_clean.info())
+            print(df_clean.head())
         
         # Transform the data (perform feature engineering and encoding).
         df_transformed = transform_data(df_clean)
@@ -123,4 +162,27 @@ if __name__ == "__main__":
         db_path = os.path.join(project_root, "data", "processed", "employee_attrition_features.db")
         
         # Store the transformed data into the SQLite database.
-        store_transformed_data(df_transformed, db_path)
\ No newline at end of file
+        store_transformed_data(df_transformed, db_path)
+
+def run_pipeline(raw_file=None):
+    """
+    Prepare a raw CSV file and transform and store the result, keeping the clean
+    DataFrame in memory instead of re-reading it from clean_data.parquet.
+    
+    The Parquet file is still written by the preparation step as a checkpoint.
+
+    Args:
+        raw_file (str): The raw CSV file to prepare. If None, the latest stored raw
+            file is used.
+    """
+    from preparation.data_preparation import VERBOSE, prepare_data, run as prepare_latest
+    
+    df_clean = prepare_data(raw_file, verbose=VERBOSE) if raw_file else prepare_latest()
+    if df_clean is None:
+        return
+    run(df_clean)
+
+if __name__ == "__main__":
+    # Make the sibling preparation package importable when run as a script.
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    run_pipeline()
\ No newline at end of file
@@ -1,51 +1,82 @@
 # src/validation/data_validation.py
 
 import pandas as pd
+import polars as pl
 import os
 from datetime import datetime
 
+# The tokens pandas.read_csv treats as missing by default. Polars only treats empty
+# fields as null, so they are passed to the reader explicitly.
+CSV_NULL_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+]
+
+def _scan_files(root_dir, extension):
+    """
+    Recursively yield (path, mtime) for files with the given extension, reusing
+    the stat information cached on each directory entry.
+    """
+    with os.scandir(root_dir) as entries:
+        for entry in entries:
+            # Skip hidden entries, such as .DS_Store or a leftover .download_* folder.
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield from _scan_files(entry.path, extension)
+            elif entry.name.lower().endswith(extension):
+                yield entry.path, entry.stat(follow_symlinks=False).st_mtime
+
 def find_latest_file(root_dir, extension=".csv"):
     """
     Recursively search for the latest file with the specified extension in root_dir.
     """
-    latest_time = 0
-    latest_file = None
-
-    for root, _, files in os.walk(root_dir):
-        for file in files:
-            if file.lower().endswith(extension):
-                file_path = os.path.join(root, file)
-                mtime = os.path.getmtime(file_path)
-                if mtime > latest_time:
-                    latest_time = mtime
-                    latest_file = file_path
+    if not os.path.isdir(root_dir):
+        return None
+    latest_file, _ = max(_scan_files(root_dir, extension), key=lambda item: item[1], default=(None, 0))
     return latest_file
 
 def validate_data(file_path):
     """
     Validate the data quality of the CSV file.
+
+    The file is scanned lazily with Polars and all checks are computed as
+    aggregates of a single query, so the data is never materialised as a frame.
     """
     report = {}
     try:
-        df = pd.read_csv(file_path)
-        report['total_rows'] = df.shape[0]
-        report['total_columns'] = df.shape[1]
-        missing_values = df.isnull().sum()
-        report['missing_values'] = missing_values[missing_values > 0].to_dict()
-        duplicate_count = df.duplicated().sum()
-        report['duplicate_rows'] = duplicate_count
-        if 'Age' in df.columns:
-            invalid_age_rows = df[(df['Age'] < 18) | (df['Age'] > 65)]
-            report['invalid_age_rows'] = invalid_age_rows.shape[0]
-        if 'EmployeeNumber' in df.columns:
-            unique_count = df['EmployeeNumber'].nunique()
-            total_count = df.shape[0]
-            report['employee_number_unique'] = (unique_count == total_count)
+        lf = pl.scan_csv(file_path, null_values=CSV_NULL_VALUES, infer_schema_length=None)
+        columns = lf.collect_schema().names()
+        checks = [
+            pl.len().alias('total_rows'),
+            pl.struct(pl.all()).n_unique().alias('distinct_rows'),
+            pl.all().null_count().name.prefix('missing:'),
+        ]
+        if 'Age' in columns:
+            checks.append(((pl.col('Age') < 18) | (pl.col('Age') > 65)).sum().alias('invalid_age_rows'))
+        if 'EmployeeNumber' in columns:
+            checks.append(pl.col('EmployeeNumber').drop_nulls().n_unique().alias('employee_number_count'))
+        result = lf.select(checks).collect().row(0, named=True)
+
+        report['total_rows'] = result['total_rows']
+        report['total_columns'] = len(columns)
+        report['missing_values'] = {
+            col: result[f'missing:{col}'] for col in columns if result[f'missing:{col}'] > 0
+        }
+        report['duplicate_rows'] = result['total_rows'] - result['distinct_rows']
+        if 'Age' in columns:
+            report['invalid_age_rows'] = result['invalid_age_rows']
+        if 'EmployeeNumber' in columns:
+            report['employee_number_unique'] = (result['employee_number_count'] == result['total_rows'])
     except Exception as e:
         report['error'] = str(e)
     return report
 
-if __name__ == "__main__":
+def run():
+    """
+    Validate the latest stored raw CSV and save the data quality report
+    under src/validation/logs.
+    """
     # Compute project root (assumes this file is in src/validation)
     project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
     
@@ -63,9 +94,14 @@ if __name__ == "__main__":
         print("\nData Quality Report:")
         for key, value in quality_report.items():
             print(f"{key}: {value}")
-        # Optionally, save the report.
+        # Optionally, save the report next to this module rather than the
+        # current working directory, which differs when run in-process.
         report_df = pd.DataFrame([quality_report])
-        os.makedirs("logs", exist_ok=True)
-        report_path = os.path.join("logs", "data_quality_report.csv")
+        logs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+        os.makedirs(logs_dir, exist_ok=True)
+        report_path = os.path.join(logs_dir, "data_quality_report.csv")
         report_df.to_csv(report_path, index=False)
-        print(f"\nData quality report saved to {report_path}")
\ No newline at end of file
+        print(f"\nData quality report saved to {report_path}")
+
+if __name__ == "__main__":
+    run()
\ No newline at end of file
@@ -1,20 +1,113 @@
 # src/versioning/data_versioning.py
 
 import os
+import queue
+import shlex
 import subprocess
+import threading
+import time
+import uuid
 from datetime import datetime
 
-def run_command(command):
+# Seconds to wait for a single git/dvc command in the shell session before giving up.
+COMMAND_TIMEOUT = 900
+
+class _ShellSession:
+    """
+    A long-lived /bin/sh process that runs commands one after another, so each
+    git/dvc call does not pay for spawning a new shell.
+    
+    Each command is followed by an echo of a unique marker and its exit status;
+    output is read up to that marker. stderr is merged into stdout. Commands are
+    evaluated in a forked subshell, so a command that does not parse or that calls
+    exit only ends that subshell and the marker is still echoed.
+    """
+
+    def __init__(self, cwd=None, timeout=None):
+        self._marker = f"__DONE_{uuid.uuid4().hex}__"
+        self._timeout = timeout
+        self._proc = subprocess.Popen(
+            ["/bin/sh", "-s"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            cwd=cwd,
+        )
+        # Read the shell's output on a background thread so reads can time out.
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read_output, daemon=True).start()
+
+    def _read_output(self):
+        for line in self._proc.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def run(self, command):
+        """
+        Run a command in the session.
+        
+        Args:
+            command (str): The shell command to execute.
+            
+        Returns:
+            tuple: The command's return code and its combined output.
+            
+        Raises:
+            TimeoutError: If the command does not finish within the session's timeout;
+                the session is terminated.
+        """
+        # The command is passed to eval as one quoted word, so the session's own script
+        # always parses. Commands read stdin from /dev/null so they cannot consume it.
+        self._proc.stdin.write(f"( eval {shlex.quote(command)} ) </dev/null\necho \"{self._marker}:$?\"\n")
+        self._proc.stdin.flush()
+        deadline = None if self._timeout is None else time.monotonic() + self._timeout
+        output = []
+        while True:
+            try:
+                remaining = None if deadline is None else max(0, deadline - time.monotonic())
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                self._proc.kill()
+                self._proc.wait()
+                raise TimeoutError(f"Command timed out after {self._timeout} seconds: {command}")
+            if line is None:
+                raise RuntimeError(f"Shell session exited while running: {command}")
+            index = line.find(self._marker)
+            if index >= 0:
+                output.append(line[:index])
+                return int(line[index + len(self._marker) + 1:]), "".join(output)
+            output.append(line)
+
+    def close(self):
+        if self._proc.poll() is None:
+            self._proc.stdin.close()
+            self._proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def run_command(command, session=None):
     """
     Run a shell command and print its output.
     
     Args:
         command (str): The shell command to execute.
+        session (_ShellSession): An open shell session to run the command in. If None,
+            the command runs in a new shell.
         
     Returns:
         int: The return code of the command.
     """
     print("Running command:", command)
+    if session is not None:
+        returncode, output = session.run(command)
+        if output:
+            print(output)
+        return returncode
     result = subprocess.run(command, shell=True, text=True, capture_output=True)
     if result.stdout:
         print(result.stdout)
@@ -22,71 +115,92 @@ def run_command(command):
         print(result.stderr)
     return result.returncode
 
-def init_dvc():
+def init_dvc(session=None):
     """
     Initialize DVC in the project if it hasn't been initialized yet.
+    
+    Args:
+        session (_ShellSession): An optional shell session to run the command in.
     """
     if not os.path.exists(".dvc"):
         print("Initializing DVC in the project...")
-        run_command("dvc init")
+        run_command("dvc init", session)
     else:
         print("DVC is already initialized.")
 
-def add_data_to_dvc(data_path):
+def add_data_to_dvc(data_path, session=None):
     """
     Add a data directory or file to DVC tracking.
     
     Args:
         data_path (str): The relative or absolute path to the data directory or file.
+        session (_ShellSession): An optional shell session to run the command in.
+
+    Raises:
+        RuntimeError: If dvc add fails.
     """
     if os.path.exists(data_path):
         print(f"Adding '{data_path}' to DVC tracking...")
-        run_command(f"dvc add {data_path}")
+        returncode = run_command(f"dvc add {shlex.quote(data_path)}", session)
+        if returncode != 0:
+            raise RuntimeError(f"dvc add failed for '{data_path}' with exit code {returncode}.")
     else:
         print(f"Data path '{data_path}' does not exist.")
 
-def commit_changes(commit_message):
+def commit_changes(commit_message, session=None):
     """
     Commit changes to Git.
     
     Args:
         commit_message (str): The commit message.
+        session (_ShellSession): An optional shell session to run the commands in.
     """
     print("Adding changes to Git...")
-    run_command("git add .")
-    run_command(f'git commit -m "{commit_message}"')
+    run_command("git add .", session)
+    run_command(f"git commit -m {shlex.quote(commit_message)}", session)
 
-def tag_version(version):
+def tag_version(version, session=None):
     """
     Tag the current Git commit with a version tag.
     
     Args:
         version (str): The version tag (e.g., v1.0).
+        session (_ShellSession): An optional shell session to run the command in.
     """
     print(f"Tagging the commit with version '{version}'...")
-    run_command(f"git tag {version}")
+    run_command(f"git tag {shlex.quote(version)}", session)
 
-if __name__ == "__main__":
+def run():
+    """
+    Version the raw and processed data with DVC and tag the Git commit.
+    """
     # Compute the project root (assumes this file is in src/versioning)
     project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
     os.chdir(project_root)  # Ensure commands run in the project root
 
-    # Step 1: Initialize DVC.
-    init_dvc()
-    
-    # Step 2: Add raw and processed data to DVC tracking.
-    raw_data_path = os.path.join(project_root, "data", "raw")
-    processed_data_path = os.path.join(project_root, "data", "processed")
-    
-    add_data_to_dvc(raw_data_path)
-    add_data_to_dvc(processed_data_path)
-    
-    # Step 3: Commit changes with a timestamped message.
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    commit_message = f"Data version update: {current_time}"
-    commit_changes(commit_message)
-    
-    # Step 4: Tag the commit with a version identifier.
-    tag_version("v1.1")
+    # Run all git/dvc commands through one shell process.
+    with _ShellSession(cwd=project_root, timeout=COMMAND_TIMEOUT) as session:
+        # Step 1: Initialize DVC.
+        init_dvc(session)
+        
+        # Step 2: Add raw and processed data to DVC tracking.
+        # Ingestion stores the raw downloads directly in the dated data/stored/raw tree,
+        # which is git-ignored so DVC can track it.
+        raw_data_path = os.path.join(project_root, "data", "stored", "raw")
+        processed_data_path = os.path.join(project_root, "data", "processed")
+        
+        add_data_to_dvc(raw_data_path, session)
+        add_data_to_dvc(processed_data_path, session)
+        
+        # Step 3: Commit changes with a timestamped message.
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        commit_message = f"Data version update: {current_time}"
+        commit_changes(commit_message, session)
+        
+        # Step 4: Tag the commit with a version identifier.
+        tag_version("v1.1", session)
     
-    print("Data versioning complete.")
\ No newline at end of file
+    print("Data versioning complete.")
+
+if __name__ == "__main__":
+    run()
\ No newline at end of file